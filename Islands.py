@@ -3,24 +3,19 @@ from tkinter import messagebox
 import sys
 import subprocess
 import importlib.util
-import math
-import csv
-from PIL import Image
-import numpy as np
-from OpenGL.GL import *
-from OpenGL.GLU import *
-from pyopengltk import OpenGLFrame
-from scipy.spatial import cKDTree
+import queue
+import threading
 
 # --- Dependency Check ---
 def check_and_install_dependencies():
     required_packages = {
         'numpy': 'numpy',
+        'pandas': 'pandas',
+        'numba': 'numba',
         'PyOpenGL': 'OpenGL',
         'PyOpenGL_accelerate': 'OpenGL_accelerate',
         'pyopengltk': 'pyopengltk',
-        'Pillow': 'PIL',
-        'scipy': 'scipy'
+        'Pillow': 'PIL'
     }
     missing_packages = []
 
@@ -69,14 +64,229 @@ def check_and_install_dependencies():
             root.destroy()
             sys.exit("Aborted by user.")
 
-check_and_install_dependencies()
+# Only scan for missing packages when an import actually fails
+try:
+    from PIL import Image
+    import numpy as np
+    import pandas as pd
+    from OpenGL.GL import *
+    from OpenGL.GL import shaders
+    from OpenGL.GLU import gluDeleteQuadric, gluNewQuadric, gluPerspective, gluQuadricTexture, gluSphere
+    from pyopengltk import OpenGLFrame
+    from numba import njit, prange
+except ImportError:
+    check_and_install_dependencies()
+    raise
+
+# --- Colormaps ---
+LUT_SIZE = 256
+POINT_ALPHA_MIN = 0.3  # alpha of the least populated points under additive blending
+POINT_ALPHA_SCALE = 0.7  # extra alpha, scaled by the squared normalized population
+POSITION_SCALE = 32767  # int16 full scale for positions normalized to the sphere radius
+CSV_CHUNK_ROWS = 16384  # rows parsed per streamed chunk
+LOAD_POLL_MS = 50  # how often the UI checks for freshly loaded chunks
+DEG_TO_RAD = np.float32(np.pi / 180)  # float32 so the coordinate math never upcasts
+
+def _rgba(r, g, b, a):
+    """Stack scalar or per-value channels into an (N, 4) RGBA array"""
+    return np.stack(np.broadcast_arrays(r, g, b, a), axis=-1).astype(np.float32)
+
+def _select_rgba(conds, segments):
+    """Pick each segment's RGBA where its condition holds; the last segment is the default"""
+    return _rgba(*[
+        np.select(conds, [seg[c] for seg in segments[:-1]], default=segments[-1][c])
+        for c in range(4)
+    ])
+
+def _plasma(v):
+    # Plasma-like colormap: dark blue -> purple -> pink -> yellow
+    conds = [v < 0.25, v < 0.5, v < 0.75]
+    t = np.select(conds, [v * 4, (v - 0.25) * 4, (v - 0.5) * 4], default=(v - 0.75) * 4)
+    return _select_rgba(conds, [
+        (0.1 + 0.4*t, 0.0, 0.3 + 0.4*t, 0.8),    # Dark blue to purple
+        (0.5 + 0.3*t, 0.1*t, 0.7 - 0.2*t, 0.9),  # Purple to pink
+        (0.8 + 0.2*t, 0.1 + 0.4*t, 0.5 - 0.5*t, 1.0),  # Pink to orange
+        (1.0, 0.5 + 0.5*t, 0.0, 1.0),            # Orange to yellow
+    ])
+
+def _viridis(v):
+    # Viridis-like: dark purple -> blue -> green -> yellow
+    conds = [v < 0.25, v < 0.5, v < 0.75]
+    t = np.select(conds, [v * 4, (v - 0.25) * 4, (v - 0.5) * 4], default=(v - 0.75) * 4)
+    return _select_rgba(conds, [
+        (0.3*t, 0.0, 0.4 + 0.2*t, 0.8),
+        (0.3 - 0.1*t, 0.2*t, 0.6 + 0.2*t, 0.9),
+        (0.2*t, 0.2 + 0.6*t, 0.8 - 0.4*t, 1.0),
+        (0.2 + 0.8*t, 0.8 + 0.2*t, 0.4 - 0.4*t, 1.0),
+    ])
+
+def _hot(v):
+    # Hot colormap: black -> red -> yellow -> white
+    conds = [v < 0.33, v < 0.66]
+    t = np.select(conds, [v * 3, (v - 0.33) * 3], default=(v - 0.66) * 3)
+    return _select_rgba(conds, [
+        (t, 0.0, 0.0, 0.7 + 0.3*t),  # Black to red
+        (1.0, t, 0.0, 1.0),          # Red to yellow
+        (1.0, 1.0, t, 1.0),          # Yellow to white
+    ])
+
+def _cool(v):
+    # Cool colormap: cyan to magenta
+    return _rgba(v, 1.0 - v, 1.0, 0.8)
+
+def _rainbow(v):
+    # Rainbow colormap
+    hue = v * 300  # 0 to 300 degrees (red to magenta)
+    r, g, b = hsv_to_rgb(hue, 1.0, 1.0)
+    return _rgba(r, g, b, 0.9)
+
+def _green_red(v):
+    # Original green-red gradient
+    return _rgba(v, 1.0 - v, 0.0, 0.8)
+
+def hsv_to_rgb(h, s, v):
+    """Convert HSV to RGB for arrays of hues (degrees)"""
+    h = np.asarray(h) % 360
+    c = v * s
+    hh = h / 60
+    x = c * (1 - np.abs(hh % 2 - 1))
+    m = v - c
+    sextant = np.minimum(hh.astype(np.int32), 5)
+
+    r = np.choose(sextant, [c, x, 0, 0, x, c])
+    g = np.choose(sextant, [x, c, c, x, 0, 0])
+    b = np.choose(sextant, [0, 0, x, c, c, x])
+    return (r + m, g + m, b + m)
+
+COLOR_SCHEMES = {
+    'plasma': _plasma,
+    'viridis': _viridis,
+    'hot': _hot,
+    'cool': _cool,
+    'rainbow': _rainbow,
+    'green-red': _green_red,
+}
+
+_color_luts = {}
+
+def get_color_lut(scheme):
+    """Return the (LUT_SIZE, 4) RGBA8 table for a scheme, building it on first use"""
+    if scheme not in _color_luts:
+        colormap = COLOR_SCHEMES.get(scheme, _green_red)  # default green-red
+        values = np.linspace(0.0, 1.0, LUT_SIZE, dtype=np.float32)
+        colors = colormap(values)
+        # Squared alpha: with additive blending dense, populous areas saturate while sparse ones stay faint
+        colors[:, 3] = POINT_ALPHA_MIN + POINT_ALPHA_SCALE * values**2
+        _color_luts[scheme] = np.round(np.clip(colors, 0.0, 1.0) * 255).astype(np.uint8)
+    return _color_luts[scheme]
+
+# --- CPU Coloring (used when the point shader is unavailable) ---
+@njit(parallel=True, cache=True)
+def _population_range(pop, log_scale):
+    """Min of the positive scaled populations and max of all of them, in one parallel pass"""
+    lo = np.inf
+    hi = -np.inf
+    for i in prange(pop.size):
+        v = np.log1p(pop[i]) if log_scale else pop[i]
+        if v > 0:
+            lo = min(lo, v)
+        hi = max(hi, v)
+    return lo, hi
+
+@njit(parallel=True, fastmath=True, cache=True)
+def _build_colors(pop, lut, log_scale, min_value, inv_range, out):
+    """Scale, normalize and look up each population's LUT color in a single sweep"""
+    top = lut.shape[0] - 1
+    for i in prange(pop.size):
+        v = np.log1p(pop[i]) if log_scale else pop[i]
+        idx = int(max((v - min_value) * inv_range, 0.0) * top + 0.5)
+        idx = min(idx, top)
+        for c in range(4):
+            out[i, c] = lut[idx, c]
+
+# --- Point Shader ---
+POPULATION_ATTRIB = 1  # kept off location 0, which aliases gl_Vertex on some drivers
+
+POINT_VERTEX_SHADER = """
+#version 120
+attribute float population;
+uniform bool log_scale;
+uniform float min_value;
+uniform float inv_range;
+varying float value;
+
+void main() {
+    float scaled = log_scale ? log(1.0 + population) : population;
+    value = max((scaled - min_value) * inv_range, 0.0);
+    gl_Position = ftransform();
+}
+"""
+
+POINT_FRAGMENT_SHADER = """
+#version 120
+uniform sampler1D lut;
+varying float value;
+
+void main() {
+    // Map 0-1 onto the LUT texel centres
+    gl_FragColor = texture1D(lut, (clamp(value, 0.0, 1.0) * %d.0 + 0.5) / %d.0);
+}
+""" % (LUT_SIZE - 1, LUT_SIZE)
+
+def compile_point_program():
+    """Build the program that colors points from their population via the LUT texture"""
+    vertex = shaders.compileShader(POINT_VERTEX_SHADER, GL_VERTEX_SHADER)
+    fragment = shaders.compileShader(POINT_FRAGMENT_SHADER, GL_FRAGMENT_SHADER)
+    program = glCreateProgram()
+    glAttachShader(program, vertex)
+    glAttachShader(program, fragment)
+    glBindAttribLocation(program, POPULATION_ATTRIB, 'population')
+    glLinkProgram(program)
+    glDeleteShader(vertex)
+    glDeleteShader(fragment)
+    if glGetProgramiv(program, GL_LINK_STATUS) != GL_TRUE:
+        raise RuntimeError(glGetProgramInfoLog(program))
+    return program
+
+# --- Point Ordering ---
+MORTON_BITS = 10  # grid resolution per axis
+
+def _spread_bits(v):
+    """Insert two zero bits between each of the low 10 bits of v"""
+    v = v & 0x3FF
+    v = (v | (v << 16)) & 0x030000FF
+    v = (v | (v << 8)) & 0x0300F00F
+    v = (v | (v << 4)) & 0x030C30C3
+    v = (v | (v << 2)) & 0x09249249
+    return v
+
+def morton_order(points, radius):
+    """Return the permutation sorting points along a Z-order curve over the sphere's bounding cube"""
+    grid = (1 << MORTON_BITS) - 1
+    cells = np.clip((points + radius) * (grid / (2 * radius)), 0, grid).astype(np.uint32)
+    codes = _spread_bits(cells[:, 0]) | (_spread_bits(cells[:, 1]) << 1) | (_spread_bits(cells[:, 2]) << 2)
+    return np.argsort(codes, kind='stable')
+
+def count_lines(filepath):
+    """Cheap estimate of the rows in a CSV, used to size the point arrays up front"""
+    with open(filepath, 'rb') as f:
+        # +1 in case the last line has no trailing newline
+        return sum(block.count(b'\n') for block in iter(lambda: f.read(1 << 20), b'')) + 1
 
 # --- OpenGL Frame ---
 class EarthViewerFrame(OpenGLFrame):
     def __init__(self, *args, **kw):
         super().__init__(*args, **kw)
-        self.points_vbo = None
+        self.points_vbo = np.empty((0, 3), dtype=np.float32)  # loaded part of points_storage
         self.colors_vbo = None
+        self.populations = np.empty(0, dtype=np.float32)  # loaded part of populations_storage
+        self.points_buffer_id = None
+        self.colors_buffer_id = None
+        self.populations_buffer_id = None
+        self.lut_texture_id = None
+        self.point_program = None
+        self.point_uniforms = {}  # uniform name -> location in point_program
+        self.sphere_list_id = None
         self.point_count = 0
         self.rotation_angle_x = 0  # Point cloud X
         self.rotation_angle_y = 0  # Point cloud Y
@@ -85,26 +295,27 @@ class EarthViewerFrame(OpenGLFrame):
         self.sphere_rotation_z = 270  # Sphere Z
         self.last_mouse_pos = {'x': 0, 'y': 0}
         self.is_dragging = False
+        self.redraw_pending = False
         self.zoom = -8
+        self.radius = 2.5
         
         # Heatmap parameters
         self.color_scheme = 'plasma'  # plasma, viridis, hot, cool, rainbow
         self.use_logarithmic = True
-        self.alpha_blending = True
+        self.range_cache = {}  # use_logarithmic -> (min, 1 / range) of scaled populations
 
-        # --- Load Points ---
+        # --- Load Points (streamed in the background, appended as chunks arrive) ---
+        # Size the arrays once from a line count so chunks are written in place
         try:
-            points_list, populations_list = self.generate_points_from_csv("GeoNames_Cleaned.csv", radius=2.5)
-            if points_list:
-                self.points_vbo = np.array(points_list, dtype=np.float32)
-                self.populations = np.array(populations_list, dtype=np.float32)
-                self.point_count = len(self.points_vbo)
-                # --- Compute colors from population data ---
-                self.colors_vbo = self.compute_population_colors(self.populations)
-        except FileNotFoundError:
-            print("Error: 'GeoNames_Cleaned.csv' not found. Cannot display points.")
-        except Exception as e:
-            print(f"An error occurred: {e}")
+            capacity = count_lines("GeoNames_Cleaned.csv")
+        except OSError:
+            capacity = 0  # the loader reports the missing file
+        self.points_storage = np.empty((capacity, 3), dtype=np.float32)
+        self.populations_storage = np.empty(capacity, dtype=np.float32)
+        self.chunk_queue = queue.Queue()
+        self.loading = True
+        threading.Thread(target=self.load_points, args=("GeoNames_Cleaned.csv",), daemon=True).start()
+        self.after(LOAD_POLL_MS, self.poll_loaded_points)
 
         # --- Mouse Events ---
         self.bind("<ButtonPress-1>", self.on_mouse_press)
@@ -121,10 +332,8 @@ class EarthViewerFrame(OpenGLFrame):
         glEnable(GL_TEXTURE_2D)
         glEnable(GL_POINT_SMOOTH)
         
-        # Enable alpha blending for better heatmap visualization
-        if self.alpha_blending:
-            glEnable(GL_BLEND)
-            glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+        # Additive blending for the heatmap points (order independent, enabled only while drawing them)
+        glBlendFunc(GL_SRC_ALPHA, GL_ONE)
         
         glPointSize(4.0)  # Slightly larger points for better visibility
 
@@ -132,6 +341,20 @@ class EarthViewerFrame(OpenGLFrame):
         self.texture_id = glGenTextures(1)
         self.load_texture("earth_texture.jpg")  # Replace with your texture
 
+        # --- Sphere Geometry (tessellated once into a display list) ---
+        if self.sphere_list_id is None:
+            self.sphere_list_id = glGenLists(1)
+            glNewList(self.sphere_list_id, GL_COMPILE)
+            quad = gluNewQuadric()
+            gluQuadricTexture(quad, GL_TRUE)
+            gluSphere(quad, self.radius, 36, 18)
+            gluDeleteQuadric(quad)
+            glEndList()
+
+        # --- Point Buffers (initgl also runs on resize, so upload only once) ---
+        if self.points_buffer_id is None:
+            self.create_point_buffers()
+
         glMatrixMode(GL_PROJECTION)
         glLoadIdentity()
         if self.height > 0:
@@ -139,7 +362,129 @@ class EarthViewerFrame(OpenGLFrame):
         glMatrixMode(GL_MODELVIEW)
         glLoadIdentity()
 
+    def create_point_buffers(self):
+        # Allocated at full capacity up front; upload_points fills them as chunks arrive
+        self.points_buffer_id = glGenBuffers(1)
+
+        try:
+            self.point_program = compile_point_program()
+        except Exception as e:
+            print(f"Point shader unavailable, coloring points on the CPU: {e}")
+
+        if self.point_program is not None:
+            self.point_uniforms = {
+                name: glGetUniformLocation(self.point_program, name)
+                for name in ('log_scale', 'min_value', 'inv_range')
+            }
+            # Colors are looked up on the GPU: upload raw populations plus the scheme's LUT
+            self.populations_buffer_id = glGenBuffers(1)
+            self.lut_texture_id = glGenTextures(1)
+            glBindTexture(GL_TEXTURE_1D, self.lut_texture_id)
+            glTexImage1D(GL_TEXTURE_1D, 0, GL_RGBA8, LUT_SIZE, 0,
+                         GL_RGBA, GL_UNSIGNED_BYTE, get_color_lut(self.color_scheme))
+            glTexParameteri(GL_TEXTURE_1D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
+            glTexParameteri(GL_TEXTURE_1D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
+            glTexParameteri(GL_TEXTURE_1D, GL_TEXTURE_WRAP_S, GL_CLAMP_TO_EDGE)
+            glBindTexture(GL_TEXTURE_1D, 0)
+        else:
+            self.colors_buffer_id = glGenBuffers(1)
+        self.allocate_point_buffers()
+
+    def allocate_point_buffers(self):
+        """Size the point buffers to the storage capacity; upload_points fills in the contents"""
+        capacity = len(self.points_storage)
+        buffers = [
+            (self.points_buffer_id, 3 * np.dtype(np.int16).itemsize, GL_STATIC_DRAW),
+            (self.populations_buffer_id, np.dtype(np.float32).itemsize, GL_STATIC_DRAW),
+            (self.colors_buffer_id, 4, GL_DYNAMIC_DRAW),  # RGBA8
+        ]
+        for buffer_id, point_bytes, usage in buffers:
+            if buffer_id is not None:
+                glBindBuffer(GL_ARRAY_BUFFER, buffer_id)
+                glBufferData(GL_ARRAY_BUFFER, capacity * point_bytes, None, usage)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+    def grow_storage(self, count):
+        """Enlarge the point arrays and GPU buffers to hold at least count points"""
+        capacity = max(count, 2 * len(self.points_storage))
+        print(f"Point storage too small for {count} points, growing to {capacity}")
+        points_storage = np.empty((capacity, 3), dtype=np.float32)
+        populations_storage = np.empty(capacity, dtype=np.float32)
+        points_storage[:self.point_count] = self.points_vbo
+        populations_storage[:self.point_count] = self.populations
+        self.points_storage = points_storage
+        self.populations_storage = populations_storage
+        self.allocate_point_buffers()
+
+    def upload_points(self, start):
+        """Copy points from index start onward into the GPU buffers"""
+        # Every point lies on the sphere, so int16 is plenty once scaled by the radius
+        packed_points = np.round(self.points_vbo[start:] / self.radius * POSITION_SCALE).astype(np.int16)
+        arrays = [(self.points_buffer_id, start, packed_points)]
+        if self.point_program is not None:
+            arrays.append((self.populations_buffer_id, start, self.populations[start:]))
+        else:
+            # The population range may have moved, so every color is recomputed
+            self.colors_vbo = self.compute_population_colors(self.populations)
+            arrays.append((self.colors_buffer_id, 0, self.colors_vbo))
+
+        for buffer_id, first, data in arrays:
+            glBindBuffer(GL_ARRAY_BUFFER, buffer_id)
+            glBufferSubData(GL_ARRAY_BUFFER, first * (data.nbytes // len(data)), data.nbytes, data)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+    def load_points(self, filepath):
+        """Loader thread: parse the CSV in chunks and queue them for the GL thread"""
+        try:
+            for chunk in self.generate_points_from_csv(filepath, radius=self.radius):
+                self.chunk_queue.put(chunk)
+        except FileNotFoundError:
+            print(f"Error: '{filepath}' not found. Cannot display points.")
+        except Exception as e:
+            print(f"An error occurred: {e}")
+        finally:
+            self.chunk_queue.put(None)  # Loading finished
+
+    def poll_loaded_points(self):
+        # Tk and GL calls stay on the main thread; just wake redraw, which does the upload
+        if self.context_created and not self.chunk_queue.empty():
+            self.request_redraw()
+        if self.loading:
+            self.after(LOAD_POLL_MS, self.poll_loaded_points)
+
+    def drain_loaded_points(self):
+        """Append chunks the loader has finished to the point arrays and GPU buffers"""
+        chunks = []
+        while not self.chunk_queue.empty():
+            chunk = self.chunk_queue.get_nowait()
+            if chunk is None:
+                self.loading = False
+            elif len(chunk[0]) > 0:
+                chunks.append(chunk)
+        if not chunks:
+            return
+
+        start = self.point_count
+        total = start + sum(len(points) for points, _ in chunks)
+        if total > len(self.points_storage):
+            # count_lines is only an estimate (e.g. '\r'-only line endings, or the file changed):
+            # grow, then re-send everything to the reallocated GPU buffers
+            self.grow_storage(total)
+            start = 0
+        for points, pops in chunks:
+            end = self.point_count + len(points)
+            self.points_storage[self.point_count:end] = points
+            self.populations_storage[self.point_count:end] = pops
+            self.point_count = end
+        self.points_vbo = self.points_storage[:self.point_count]
+        self.populations = self.populations_storage[:self.point_count]
+        # New points can move the population range
+        self.range_cache.clear()
+        self.upload_points(start)
+
     def redraw(self):
+        self.redraw_pending = False
+        self.drain_loaded_points()
         glLoadIdentity()
         glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
         glTranslatef(0.0, 0.0, self.zoom)
@@ -151,213 +496,170 @@ class EarthViewerFrame(OpenGLFrame):
         glRotatef(self.sphere_rotation_x, 1, 0, 0)
         glRotatef(self.sphere_rotation_y, 0, 1, 0)
         glRotatef(self.sphere_rotation_z, 0, 0, 1)
-        self.draw_textured_sphere(radius=2.5)
+        self.draw_textured_sphere()
         glPopMatrix()
 
         # --- Draw Point Cloud with Enhanced Heatmap Colors ---
-        if self.points_vbo is not None and self.point_count > 0:
+        if self.points_buffer_id is not None and self.point_count > 0:
             # Disable texture for points
             glDisable(GL_TEXTURE_2D)
+            # Still depth-test against the globe, but don't let points occlude each other
+            glEnable(GL_BLEND)
+            glDepthMask(GL_FALSE)
             
+            # Undo the int16 position packing
+            glPushMatrix()
+            scale = self.radius / POSITION_SCALE
+            glScalef(scale, scale, scale)
+
             glEnableClientState(GL_VERTEX_ARRAY)
-            glEnableClientState(GL_COLOR_ARRAY)
-            glVertexPointer(3, GL_FLOAT, 0, self.points_vbo)
-            glColorPointer(4, GL_FLOAT, 0, self.colors_vbo)  # 4 components for RGBA
+            glBindBuffer(GL_ARRAY_BUFFER, self.points_buffer_id)
+            glVertexPointer(3, GL_SHORT, 0, None)
+            if self.point_program is not None:
+                min_value, inv_range = self.population_range(self.populations)
+                glUseProgram(self.point_program)
+                glUniform1i(self.point_uniforms['log_scale'], int(self.use_logarithmic))
+                glUniform1f(self.point_uniforms['min_value'], min_value)
+                glUniform1f(self.point_uniforms['inv_range'], inv_range)
+                glBindTexture(GL_TEXTURE_1D, self.lut_texture_id)
+                glEnableVertexAttribArray(POPULATION_ATTRIB)
+                glBindBuffer(GL_ARRAY_BUFFER, self.populations_buffer_id)
+                glVertexAttribPointer(POPULATION_ATTRIB, 1, GL_FLOAT, GL_FALSE, 0, None)
+            else:
+                glEnableClientState(GL_COLOR_ARRAY)
+                glBindBuffer(GL_ARRAY_BUFFER, self.colors_buffer_id)
+                glColorPointer(4, GL_UNSIGNED_BYTE, 0, None)  # 4 components for RGBA8
+            glBindBuffer(GL_ARRAY_BUFFER, 0)
             glDrawArrays(GL_POINTS, 0, self.point_count)
+            if self.point_program is not None:
+                glDisableVertexAttribArray(POPULATION_ATTRIB)
+                glBindTexture(GL_TEXTURE_1D, 0)
+                glUseProgram(0)
+            else:
+                glDisableClientState(GL_COLOR_ARRAY)
             glDisableClientState(GL_VERTEX_ARRAY)
-            glDisableClientState(GL_COLOR_ARRAY)
+            glPopMatrix()
             
+            glDepthMask(GL_TRUE)
+            glDisable(GL_BLEND)
             # Re-enable texture
             glEnable(GL_TEXTURE_2D)
 
     def generate_points_from_csv(self, filepath, radius):
-        points = []
-        populations = []
-        with open(filepath, 'r', encoding='utf-8') as csvfile:
-            reader = csv.DictReader(csvfile)
-            for row in reader:
-                try:
-                    lat = float(row['Latitude'])
-                    lon = float(row['Longitude'])
-                    # Try different possible population column names
-                    pop = 0
-                    for pop_col in ['Population', 'population', 'POPULATION', 'Pop', 'pop']:
-                        if pop_col in row and row[pop_col]:
-                            try:
-                                pop = float(row[pop_col])
-                                break
-                            except ValueError:
-                                continue
-                    
-                    theta = math.radians(90 - lat)
-                    phi = math.radians(lon)
-                    x = -radius * math.sin(theta) * math.cos(phi)  # Inverted X-axis
-                    y = radius * math.cos(theta)
-                    z = radius * math.sin(theta) * math.sin(phi)
-                    points.append((x, y, z))
-                    populations.append(pop)
-                except (ValueError, KeyError):
-                    pass
-        return points, populations
+        """Yield (points, populations) arrays for successive chunks of the CSV"""
+        # Try different possible population column names, resolved once from the header
+        pop_columns = ['Population', 'population', 'POPULATION', 'Pop', 'pop']
+        reader = pd.read_csv(
+            filepath,
+            encoding='utf-8',
+            usecols=lambda col: col in ('Latitude', 'Longitude') or col in pop_columns,
+            chunksize=CSV_CHUNK_ROWS
+        )
+        with reader:
+            for df in reader:
+                pop_col = next((col for col in pop_columns if col in df.columns), None)
+                if pop_col is None:
+                    df['Population'] = 0
+                elif pop_col != 'Population':
+                    df = df.rename(columns={pop_col: 'Population'})
+
+                # Unparseable values become NaN; drop rows without a usable location
+                df = df[['Latitude', 'Longitude', 'Population']].apply(pd.to_numeric, errors='coerce')
+                df = df.dropna(subset=['Latitude', 'Longitude'])
+
+                lat = df['Latitude'].to_numpy(np.float32)
+                lon = df['Longitude'].to_numpy(np.float32)
+                populations = df['Population'].fillna(0).to_numpy(np.float32)
+
+                # Spherical to cartesian for all points at once, in float32 throughout
+                r = np.float32(radius)
+                theta = (np.float32(90.0) - lat) * DEG_TO_RAD
+                phi = lon * DEG_TO_RAD
+                # Each sine/cosine is evaluated once and written straight into the output
+                cos_t, sin_t = np.cos(theta), np.sin(theta)
+                cos_p, sin_p = np.cos(phi), np.sin(phi)
+                sin_t *= r  # r * sin(theta), shared by x and z
+                points = np.empty((len(lat), 3), dtype=np.float32)
+                np.multiply(sin_t, cos_p, out=points[:, 0])
+                points[:, 0] *= -1  # Inverted X-axis
+                np.multiply(cos_t, r, out=points[:, 1])
+                np.multiply(sin_t, sin_p, out=points[:, 2])
+
+                # Morton-sort so points close on the globe are close in the vertex buffer
+                order = morton_order(points, r)
+                yield points[order], populations[order]
 
     def compute_population_colors(self, populations):
         """Compute colors based on population data"""
-        print(f"Computing population colors for {len(populations)} points...")
-        
-        # Handle zero populations and apply logarithmic scaling if enabled
-        if self.use_logarithmic:
-            # Add 1 to avoid log(0), then apply log
-            pop_values = np.log1p(populations)  # log(1 + x)
-        else:
-            pop_values = populations.copy()
+        min_pop, inv_range = self.population_range(populations)
+        colors = np.empty((len(populations), 4), dtype=np.uint8)  # RGBA8
+        _build_colors(populations, get_color_lut(self.color_scheme), self.use_logarithmic,
+                      min_pop, inv_range, colors)
+        return colors
+
+    def population_range(self, populations):
+        """Return (min, 1 / (max - min)) of the positive scaled populations, cached per logarithmic setting"""
+        if self.use_logarithmic in self.range_cache:
+            return self.range_cache[self.use_logarithmic]
+
+        print(f"Normalizing populations for {len(populations)} points...")
         
-        # Filter out zero/negative values for better scaling
-        valid_pops = pop_values[pop_values > 0]
-        if len(valid_pops) == 0:
+        # Zero/negative values are left out of the minimum for better scaling
+        min_pop, max_pop = _population_range(populations, self.use_logarithmic)
+        if min_pop == np.inf:
             # All populations are zero, use uniform color
-            normalized_pops = np.zeros_like(pop_values)
+            min_pop, inv_range = 0.0, 0.0
         else:
             # Normalize to 0-1 range
-            min_pop = valid_pops.min()
-            max_pop = valid_pops.max()
-            
-            if max_pop > min_pop:
-                # Scale all values, setting negatives/zeros to 0
-                normalized_pops = np.maximum(0, (pop_values - min_pop) / (max_pop - min_pop))
-            else:
-                normalized_pops = np.zeros_like(pop_values)
-        
-        # Generate colors based on selected scheme
-        colors = self.generate_color_scheme(normalized_pops)
+            inv_range = 1.0 / (max_pop - min_pop) if max_pop > min_pop else 0.0
         
         print(f"Population range: {populations.min():.0f} - {populations.max():.0f}")
         if self.use_logarithmic:
-            print(f"Log-scaled range: {pop_values.min():.2f} - {pop_values.max():.2f}")
+            print(f"Log-scaled range: {min_pop:.2f} - {max_pop:.2f}")
         
-        return colors
-
-    def generate_color_scheme(self, normalized_values):
-        """Generate colors based on the selected color scheme"""
-        n = len(normalized_values)
-        colors = np.zeros((n, 4), dtype=np.float32)  # RGBA
-        
-        if self.color_scheme == 'plasma':
-            # Plasma-like colormap: dark blue -> purple -> pink -> yellow
-            for i, val in enumerate(normalized_values):
-                if val < 0.25:
-                    # Dark blue to purple
-                    t = val * 4
-                    colors[i] = [0.1 + 0.4*t, 0.0, 0.3 + 0.4*t, 0.8]
-                elif val < 0.5:
-                    # Purple to pink
-                    t = (val - 0.25) * 4
-                    colors[i] = [0.5 + 0.3*t, 0.1*t, 0.7 - 0.2*t, 0.9]
-                elif val < 0.75:
-                    # Pink to orange
-                    t = (val - 0.5) * 4
-                    colors[i] = [0.8 + 0.2*t, 0.1 + 0.4*t, 0.5 - 0.5*t, 1.0]
-                else:
-                    # Orange to yellow
-                    t = (val - 0.75) * 4
-                    colors[i] = [1.0, 0.5 + 0.5*t, 0.0, 1.0]
-        
-        elif self.color_scheme == 'viridis':
-            # Viridis-like: dark purple -> blue -> green -> yellow
-            for i, val in enumerate(normalized_values):
-                if val < 0.25:
-                    t = val * 4
-                    colors[i] = [0.3*t, 0.0, 0.4 + 0.2*t, 0.8]
-                elif val < 0.5:
-                    t = (val - 0.25) * 4
-                    colors[i] = [0.3 - 0.1*t, 0.2*t, 0.6 + 0.2*t, 0.9]
-                elif val < 0.75:
-                    t = (val - 0.5) * 4
-                    colors[i] = [0.2*t, 0.2 + 0.6*t, 0.8 - 0.4*t, 1.0]
-                else:
-                    t = (val - 0.75) * 4
-                    colors[i] = [0.2 + 0.8*t, 0.8 + 0.2*t, 0.4 - 0.4*t, 1.0]
-        
-        elif self.color_scheme == 'hot':
-            # Hot colormap: black -> red -> yellow -> white
-            for i, val in enumerate(normalized_values):
-                if val < 0.33:
-                    # Black to red
-                    t = val * 3
-                    colors[i] = [t, 0.0, 0.0, 0.7 + 0.3*t]
-                elif val < 0.66:
-                    # Red to yellow
-                    t = (val - 0.33) * 3
-                    colors[i] = [1.0, t, 0.0, 1.0]
-                else:
-                    # Yellow to white
-                    t = (val - 0.66) * 3
-                    colors[i] = [1.0, 1.0, t, 1.0]
-        
-        elif self.color_scheme == 'cool':
-            # Cool colormap: cyan to magenta
-            for i, val in enumerate(normalized_values):
-                colors[i] = [val, 1.0 - val, 1.0, 0.8]
-        
-        elif self.color_scheme == 'rainbow':
-            # Rainbow colormap
-            for i, val in enumerate(normalized_values):
-                hue = val * 300  # 0 to 300 degrees (red to magenta)
-                rgb = self.hsv_to_rgb(hue, 1.0, 1.0)
-                colors[i] = [rgb[0], rgb[1], rgb[2], 0.9]
-        
-        else:  # default green-red
-            # Original green-red gradient
-            for i, val in enumerate(normalized_values):
-                colors[i] = [val, 1.0 - val, 0.0, 0.8]
-        
-        return colors
-
-    def hsv_to_rgb(self, h, s, v):
-        """Convert HSV to RGB"""
-        h = h % 360
-        c = v * s
-        x = c * (1 - abs((h / 60) % 2 - 1))
-        m = v - c
-        
-        if 0 <= h < 60:
-            r, g, b = c, x, 0
-        elif 60 <= h < 120:
-            r, g, b = x, c, 0
-        elif 120 <= h < 180:
-            r, g, b = 0, c, x
-        elif 180 <= h < 240:
-            r, g, b = 0, x, c
-        elif 240 <= h < 300:
-            r, g, b = x, 0, c
-        else:
-            r, g, b = c, 0, x
-        
-        return (r + m, g + m, b + m)
+        self.range_cache[self.use_logarithmic] = (min_pop, inv_range)
+        return min_pop, inv_range
 
     def update_heatmap_settings(self, scheme=None, logarithmic=None):
         """Update heatmap parameters and recompute colors"""
+        scheme_changed = scheme is not None and scheme != self.color_scheme
+        log_changed = logarithmic is not None and logarithmic != self.use_logarithmic
+        if not (scheme_changed or log_changed):
+            return
+
         if scheme is not None:
             self.color_scheme = scheme
         if logarithmic is not None:
             self.use_logarithmic = logarithmic
         
-        if hasattr(self, 'populations') and self.populations is not None:
+        if self.lut_texture_id is not None:
+            # The shader picks up the log setting as a uniform; only a scheme change touches the LUT
+            if scheme_changed:
+                self.tkMakeCurrent()
+                glBindTexture(GL_TEXTURE_1D, self.lut_texture_id)
+                glTexSubImage1D(GL_TEXTURE_1D, 0, 0, LUT_SIZE, GL_RGBA, GL_UNSIGNED_BYTE,
+                                get_color_lut(self.color_scheme))
+                glBindTexture(GL_TEXTURE_1D, 0)
+        elif self.colors_buffer_id is not None and self.point_count > 0:
+            # The population range is cached per log setting, so a scheme switch is one kernel pass
             self.colors_vbo = self.compute_population_colors(self.populations)
-            self.redraw()
-
-    def draw_textured_sphere(self, radius):
+            # Same size as before, so overwrite the GPU copy in place
+            self.tkMakeCurrent()
+            glBindBuffer(GL_ARRAY_BUFFER, self.colors_buffer_id)
+            glBufferSubData(GL_ARRAY_BUFFER, 0, self.colors_vbo.nbytes, self.colors_vbo)
+            glBindBuffer(GL_ARRAY_BUFFER, 0)
+        self.request_redraw()
+
+    def draw_textured_sphere(self):
         glBindTexture(GL_TEXTURE_2D, self.texture_id)
-        quad = gluNewQuadric()
-        gluQuadricTexture(quad, GL_TRUE)
-        gluSphere(quad, radius, 36, 18)
-        gluDeleteQuadric(quad)
+        glCallList(self.sphere_list_id)
 
     def load_texture(self, filepath):
         try:
             img = Image.open(filepath)
             img = img.convert('RGB')
             img = img.transpose(Image.FLIP_LEFT_RIGHT)
-            img_data = np.array(list(img.getdata()), np.uint8)
+            img_data = np.asarray(img, dtype=np.uint8)  # (H, W, 3), one buffer copy
             glBindTexture(GL_TEXTURE_2D, self.texture_id)
             glTexImage2D(GL_TEXTURE_2D, 0, GL_RGB, img.width, img.height, 0,
                          GL_RGB, GL_UNSIGNED_BYTE, img_data)
@@ -366,6 +668,12 @@ class EarthViewerFrame(OpenGLFrame):
         except Exception as e:
             print(f"Error loading texture '{filepath}': {e}")
 
+    def request_redraw(self):
+        """Repaint once on the next idle cycle, however many events ask for it"""
+        if not self.redraw_pending:
+            self.redraw_pending = True
+            self.after_idle(self.tkExpose, None)
+
     # --- Mouse handlers ---
     def on_mouse_press(self, event):
         self.is_dragging = True
@@ -383,6 +691,7 @@ class EarthViewerFrame(OpenGLFrame):
             self.rotation_angle_x += dy * 0.5
             self.last_mouse_pos['x'] = event.x
             self.last_mouse_pos['y'] = event.y
+            self.request_redraw()
 
     def on_mouse_wheel(self, event):
         # More precise zoom increments
@@ -395,6 +704,7 @@ class EarthViewerFrame(OpenGLFrame):
         
         # Tighter zoom limits for better control
         self.zoom = max(min(self.zoom, -1.0), -50.0)  # Closer minimum, further maximum
+        self.request_redraw()
 
 # --- Main Window ---
 if __name__ == '__main__':
@@ -448,7 +758,7 @@ if __name__ == '__main__':
         app.sphere_rotation_x = x_slider.get()
         app.sphere_rotation_y = y_slider.get()
         app.sphere_rotation_z = z_slider.get()
-        app.redraw()
+        app.request_redraw()
 
     def update_heatmap(_=None):
         app.update_heatmap_settings(
@@ -469,5 +779,5 @@ if __name__ == '__main__':
     tk.Label(legend_frame, text="Heatmap: Low Population ← → High Population", 
              font=('Arial', 10)).pack()
 
-    app.animate = 1
+    app.animate = 0  # Repaint only when input changes the view
     root.mainloop()
\ No newline at end of file